@@ -31,20 +31,27 @@ max_articles = st.sidebar.slider(
 
 llm_model = st.sidebar.text_input("Modelo LLM (Ollama)", value="llama3")
 
-# Crear el coordinador una vez por ejecución
-coordinator = CoordinatorAgent(
-    days=days,
-    interval="1d",
-    max_articles=max_articles,
-    llm_model_name=llm_model,
-)
+# El coordinador (y con él el NLPAgent y sus recursos NLTK) se reutiliza
+# entre reruns; solo se reconstruye si cambian los parámetros.
+@st.cache_resource(show_spinner=False)
+def get_coordinator(days: int, interval: str, max_articles: int, llm_model: str) -> CoordinatorAgent:
+    return CoordinatorAgent(
+        days=days,
+        interval=interval,
+        max_articles=max_articles,
+        llm_model_name=llm_model,
+    )
+
+
+coordinator = get_coordinator(days, "1d", max_articles, llm_model)
 
 if st.button("▶ Ejecutar análisis"):
     if not user_query.strip():
         st.warning("Por favor escribe una consulta.")
     else:
-        with st.spinner("Ejecutando agentes y generando informe..."):
-            result = coordinator.run(user_query)
+        with st.spinner("Ejecutando agentes..."):
+            # El informe del LLM se genera en streaming más abajo
+            result = coordinator.run(user_query, call_llm=False)
 
         # --- Sección 1: Tickers detectados ---
         st.subheader("Tickers detectados")
@@ -57,7 +64,9 @@ if st.button("▶ Ejecutar análisis"):
                 # --- Sección 3: Gráfico de precios ---
         st.subheader("Evolución de precios")
 
-        precios_df = pd.DataFrame()
+        # Construir el frame una sola vez desde un dict: asignar columna a
+        # columna sobre un DataFrame copia todos los bloques en cada paso.
+        series_map = {}
 
         for t, df in result["market_raw"].items():
             # Asumimos que data_utils devuelve una columna 'Date'
@@ -67,10 +76,11 @@ if st.button("▶ Ejecutar análisis"):
             else:
                 # Si la fecha viene en el índice, usamos el índice tal cual
                 serie = df["Close"]
-                serie.index = df.index  # por claridad
 
-            serie.name = t            # nombre de la serie = ticker
-            precios_df[t] = serie     # cada columna = un ticker
+            series_map[t] = serie     # cada columna = un ticker
+
+        # pandas alinea los índices de todas las series en una sola pasada
+        precios_df = pd.DataFrame(series_map)
 
         if not precios_df.empty:
             # Streamlit usa el índice como eje X y cada columna como una línea
@@ -97,4 +107,14 @@ if st.button("▶ Ejecutar análisis"):
 
         # --- Sección 6: Informe del analista (LLM) ---
         st.subheader("Informe del Analista (LLM / Ollama)")
-        st.markdown(result["llm_answer"])
+        # Streaming: se pinta cada trozo según lo genera el modelo,
+        # en lugar de esperar a la respuesta completa.
+        llm_answer = st.write_stream(
+            coordinator.llm_agent.build_and_call_stream(
+                user_query=user_query,
+                market_summary=result["market_summary"],
+                sentiments=result["sentiments"],
+                news=result["news"],
+            )
+        )
+        result["llm_answer"] = llm_answer
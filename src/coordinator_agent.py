@@ -4,6 +4,9 @@ Agente coordinador del sistema multi-agente de análisis financiero.
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import re
 from dataclasses import dataclass, field
 from typing import Dict, List, Any
 
@@ -20,23 +23,23 @@ from llm_analyst_agent import LLMAnalystAgent
 
 TICKER_PATTERN = r"\b[A-Z]{1,5}\b"
 
+_TICKER_RE = re.compile(TICKER_PATTERN)
+
+
+@functools.lru_cache(maxsize=256)
+def _extract_tickers_cached(query: str) -> tuple:
+    # dict.fromkeys elimina duplicados conservando el orden en una pasada
+    return tuple(dict.fromkeys(_TICKER_RE.findall(query)))
+
 
 def extract_tickers_from_query(query: str) -> List[str]:
     """
     Extrae posibles tickers (códigos en mayúsculas) de la consulta del usuario.
     Ejemplo: 'Analiza AAPL y NVDA esta semana' -> ['AAPL', 'NVDA']
-    """
-    import re
 
-    tickers = re.findall(TICKER_PATTERN, query)
-    # Eliminar duplicados conservando orden
-    seen = set()
-    unique = []
-    for t in tickers:
-        if t not in seen:
-            seen.add(t)
-            unique.append(t)
-    return unique
+    Memoizada: la misma consulta se repite en cada rerun de Streamlit.
+    """
+    return list(_extract_tickers_cached(query))
 
 
 # --------- CoordinatorAgent --------- #
@@ -66,35 +69,65 @@ class CoordinatorAgent:
         self.nlp_agent = NLPAgent()
         self.llm_agent = LLMAnalystAgent(model_name=self.llm_model_name)
 
-    def run(self, user_query: str, tickers: List[str] | None = None) -> Dict[str, Any]:
+    def run(
+        self,
+        user_query: str,
+        tickers: List[str] | None = None,
+        call_llm: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta el flujo completo para una consulta del usuario.
+
+        Envoltorio síncrono sobre `run_async`.
+        """
+        return asyncio.run(self.run_async(user_query, tickers, call_llm=call_llm))
+
+    async def run_async(
+        self,
+        user_query: str,
+        tickers: List[str] | None = None,
+        call_llm: bool = True,
+    ) -> Dict[str, Any]:
         """
         Ejecuta el flujo completo para una consulta del usuario.
 
         Si `tickers` es None, intenta extraerlos automáticamente
         desde la consulta.
+
+        Con `call_llm=False` se omite la llamada al LLM (útil cuando el
+        informe se genera en streaming desde la interfaz); en ese caso
+        `llm_answer` queda en None.
         """
         if not tickers:
             tickers = extract_tickers_from_query(user_query)
 
-        # 1. Datos de mercado
-        market_raw = self.market_agent.get_data(tickers)
-        market_summary = self.market_agent.summarize(market_raw)
+        # 1. Datos de mercado y noticias: no dependen entre sí,
+        #    así que se lanzan en paralelo y se espera al más lento.
+        market_task = asyncio.create_task(
+            asyncio.to_thread(self.market_agent.get_data, tickers)
+        )
+        news_task = asyncio.create_task(
+            asyncio.to_thread(self.web_agent.get_news, tickers)
+        )
+        market_raw, news_dict = await asyncio.gather(market_task, news_task)
 
-        # 2. Noticias (web scraping + fallback)
-        news_dict = self.web_agent.get_news(tickers)
+        market_summary = self.market_agent.summarize(market_raw)
 
-        # 3. NLP / sentimiento
+        # 2. NLP / sentimiento
         sentiments = self.nlp_agent.analyze(news_dict)
 
-        # 4. Informe del LLM
-        llm_answer = self.llm_agent.build_and_call(
-            user_query=user_query,
-            market_summary=market_summary,
-            sentiments=sentiments,
-            news=news_dict,
-        )
-
-        # 5. Guardar en memoria
+        # 3. Informe del LLM (opcional si se hará en streaming)
+        if call_llm:
+            llm_answer = self.llm_agent.build_and_call(
+                user_query=user_query,
+                market_summary=market_summary,
+                sentiments=sentiments,
+                news=news_dict,
+            )
+        else:
+            llm_answer = None
+
+        # 4. Guardar en memoria
         record = {
             "user_query": user_query,
             "tickers": tickers,
@@ -106,5 +139,5 @@ class CoordinatorAgent:
         }
         self.history.append(record)
 
-        # 6. Devolver resumen
+        # 5. Devolver resumen
         return record
@@ -4,14 +4,81 @@ Funciones auxiliares para adquisición de datos de mercado y noticias.
 
 from __future__ import annotations
 
-import re
+import asyncio
+import json
 import datetime as dt
-from typing import Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
-import requests
-import yfinance as yf
-from bs4 import BeautifulSoup
+
+if TYPE_CHECKING:
+    import httpx
+
+# yfinance, httpx y selectolax se importan de forma diferida dentro de
+# las funciones que los usan, para abaratar el arranque en frío.
+
+
+# --------- Caché en disco para datos de mercado --------- #
+
+_MARKET_CACHE_DIR = Path(".cache") / "market"
+
+
+class FileCache:
+    """
+    Caché sencillo en disco: cada entrada es un parquet con el DataFrame
+    y un JSON al lado con el timestamp de escritura (para el TTL).
+    """
+
+    def __init__(self, cache_dir: Path = _MARKET_CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+
+    def _paths(self, key: str) -> tuple:
+        base = self.cache_dir / key
+        return base.with_suffix(".parquet"), base.with_suffix(".json")
+
+    def get(self, key: str, ttl_seconds: int) -> Optional[pd.DataFrame]:
+        """
+        Devuelve el DataFrame cacheado si existe y no ha expirado; si no, None.
+        """
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if time.time() - meta["timestamp"] > ttl_seconds:
+                return None
+            return pd.read_parquet(data_path)
+        except Exception:
+            return None
+
+    def set(self, key: str, df: pd.DataFrame) -> None:
+        data_path, meta_path = self._paths(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(data_path)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"timestamp": time.time()}, f)
+        except Exception as e:
+            # La caché nunca debe romper la descarga
+            print(f"⚠️ No se pudo escribir la caché ({key}): {e}")
+
+
+_market_cache = FileCache()
+
+
+def _market_cache_ttl() -> int:
+    """
+    TTL corto en horario de mercado de EE.UU. (13:30-20:00 UTC),
+    24 horas fuera de él.
+    """
+    now = dt.datetime.now(dt.timezone.utc)
+    minutes = now.hour * 60 + now.minute
+    if 13 * 60 + 30 <= minutes < 20 * 60:
+        return 900
+    return 86400
 
 
 # --------- Datos de mercado (Yahoo Finance) --------- #
@@ -26,12 +93,20 @@ def get_market_data(
 
     Retorna un diccionario {ticker: DataFrame} con columnas típicas de OHLC.
     """
+    import yfinance as yf
+
     end = dt.date.today()
     start = end - dt.timedelta(days=days)
 
-    data_dict: Dict[str, pd.DataFrame] = {}
+    ttl = _market_cache_ttl()
+
+    def _download_one(t: str) -> pd.DataFrame:
+        key = f"{t}_{start}_{end}_{interval}"
+        cached = _market_cache.get(key, ttl_seconds=ttl)
+        if cached is not None:
+            print(f"Usando caché de disco para {t} ({start} -> {end})")
+            return cached
 
-    for t in tickers:
         print(f"Descargando datos para {t} ({start} -> {end})...")
         df = yf.download(
             t,
@@ -40,6 +115,21 @@ def get_market_data(
             interval=interval,
             progress=False,
         )
+        if not df.empty:
+            _market_cache.set(key, df)
+        return df
+
+    data_dict: Dict[str, pd.DataFrame] = {}
+
+    if not tickers:
+        return data_dict
+
+    # Las descargas son puro I/O de red, así que las lanzamos en paralelo:
+    # N tickers cuestan ~1 ida y vuelta HTTP en lugar de N.
+    with ThreadPoolExecutor(max_workers=min(16, len(tickers))) as executor:
+        frames = list(executor.map(_download_one, tickers))
+
+    for t, df in zip(tickers, frames):
         if df.empty:
             print(f"⚠️  Sin datos para {t}")
             continue
@@ -54,36 +144,45 @@ def summarize_market_data(
 ) -> pd.DataFrame:
     """
     Construye un DataFrame resumen con precio inicial, final y variación porcentual.
-    """
-    rows = []
-
-    for t, df in data_dict.items():
-        df_sorted = df.sort_values(by=df.columns[0])
-        first_row = df_sorted.iloc[0]
-        last_row = df_sorted.iloc[-1]
-
-        price_col = "Adj Close" if "Adj Close" in df.columns else "Close"
-
-        price_start = float(first_row[price_col])
-        price_end = float(last_row[price_col])
-        var_pct = (price_end - price_start) / price_start * 100
-
-        rows.append(
-            {
-                "ticker": t,
-                "fecha_inicio": first_row[df.columns[0]].date()
-                if hasattr(first_row[df.columns[0]], "date")
-                else first_row[df.columns[0]],
-                "fecha_fin": last_row[df.columns[0]].date()
-                if hasattr(last_row[df.columns[0]], "date")
-                else last_row[df.columns[0]],
-                "precio_inicio": round(price_start, 2),
-                "precio_fin": round(price_end, 2),
-                "variacion_pct": round(var_pct, 2),
-            }
-        )
 
-    return pd.DataFrame(rows)
+    Trabaja sobre todos los tickers a la vez: un solo concat + groupby
+    en lugar de ordenar e indexar cada DataFrame por separado.
+    """
+    if not data_dict:
+        return pd.DataFrame()
+
+    tickers = list(data_dict)
+    date_col = next(iter(data_dict.values())).columns[0]
+
+    df_all = pd.concat(data_dict, names=["ticker", "_fila"]).reset_index(level="ticker")
+    price_col = "Adj Close" if "Adj Close" in df_all.columns else "Close"
+
+    # Orden estable por fecha: head/tail por grupo dan la primera
+    # y última fila de cada ticker.
+    df_all = df_all.sort_values(date_col, kind="stable")
+    grp = df_all.groupby("ticker", sort=False)
+    first = grp.head(1).set_index("ticker").reindex(tickers)
+    last = grp.tail(1).set_index("ticker").reindex(tickers)
+
+    def _as_dates(serie: pd.Series):
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            return serie.dt.date.tolist()
+        return serie.tolist()
+
+    price_start = first[price_col].to_numpy(dtype=float)
+    price_end = last[price_col].to_numpy(dtype=float)
+    var_pct = (price_end - price_start) / price_start * 100
+
+    return pd.DataFrame(
+        {
+            "ticker": tickers,
+            "fecha_inicio": _as_dates(first[date_col]),
+            "fecha_fin": _as_dates(last[date_col]),
+            "precio_inicio": np.round(price_start, 2),
+            "precio_fin": np.round(price_end, 2),
+            "variacion_pct": np.round(var_pct, 2),
+        }
+    )
 
 
 # --------- Noticias (web scraping + fallback) --------- #
@@ -101,67 +200,121 @@ def _fake_news_for_ticker(ticker: str, n: int = 3) -> List[Dict[str, Optional[st
     return [{"titulo": t, "url": None} for t in base[:n]]
 
 
+_NEWS_BASE_URL = "https://es-us.finanzas.yahoo.com/quote/{ticker}/news/"
+
+# Límite de peticiones simultáneas contra Yahoo Finanzas
+_NEWS_MAX_CONCURRENCY = 5
+
+
+async def _fetch_news_async(
+    session: httpx.AsyncClient,
+    ticker: str,
+    max_articles: int,
+    sem: asyncio.Semaphore,
+) -> tuple:
+    """
+    Descarga y parsea los titulares de un ticker. Devuelve (ticker, articles).
+    Ante cualquier fallo usa los titulares sintéticos de fallback.
+    """
+    from selectolax.parser import HTMLParser
+
+    url = _NEWS_BASE_URL.format(ticker=ticker)
+    print(f"Buscando noticias para {ticker} en {url}")
+
+    articles: List[Dict[str, Optional[str]]] = []
+
+    try:
+        async with sem:
+            resp = await session.get(url)
+            print(f"  -> status HTTP: {resp.status_code}")
+            status = resp.status_code
+            html = resp.text if status == 200 else ""
+
+        if status == 200:
+            # El selector CSS filtra los href en C; al bucle Python solo
+            # llegan los anchors candidatos. El corte a max_articles*4
+            # acota el trabajo Python (text/strip por nodo) aunque la
+            # página traiga cientos de enlaces de noticias.
+            tree = HTMLParser(html)
+
+            for a in tree.css('a[href*="/news/"]')[: max_articles * 4]:
+                href = a.attributes.get("href")
+                text = a.text(strip=True)
+                if href and text:
+                    full_url = (
+                        href if href.startswith("http") else "https://es-us.finanzas.yahoo.com" + href
+                    )
+                    articles.append({"titulo": text, "url": full_url})
+                    if len(articles) >= max_articles:
+                        break
+
+        if not articles or status != 200:
+            print("⚠️ Respuesta no 200 o sin titulares. Se usará fallback.")
+            articles = _fake_news_for_ticker(ticker, n=max_articles)
+
+    except Exception as e:
+        print(f"⚠️ Error al obtener noticias de {ticker}: {e}")
+        articles = _fake_news_for_ticker(ticker, n=max_articles)
+
+    return ticker, articles
+
+
+async def _get_news_async(
+    tickers: List[str],
+    max_articles: int,
+) -> Dict[str, List[Dict[str, Optional[str]]]]:
+    """
+    Lanza las descargas de noticias de todos los tickers en paralelo,
+    compartiendo un único cliente HTTP. Con HTTP/2 las N peticiones se
+    multiplexan sobre una sola conexión TLS (un único handshake).
+    """
+    import httpx
+
+    sem = asyncio.Semaphore(_NEWS_MAX_CONCURRENCY)
+
+    # Reintentos a nivel de conexión y pool acotado: un fallo de red
+    # transitorio no manda directo al fallback de titulares sintéticos.
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+    )
+
+    async with httpx.AsyncClient(
+        transport=transport,
+        timeout=10.0,
+        follow_redirects=True,
+        headers={"User-Agent": "Mozilla/5.0"},
+    ) as session:
+        pairs = await asyncio.gather(
+            *[_fetch_news_async(session, t, max_articles, sem) for t in tickers]
+        )
+
+    return dict(pairs)
+
+
 def get_news_for_tickers(
     tickers: List[str],
     max_articles: int = 5,
-    limpiar: bool = False,
-    limpiar_fn=None,
 ) -> Dict[str, Dict[str, List]]:
     """
     Intenta obtener titulares de noticias para cada ticker.
     Si Yahoo Finanzas falla (códigos 4xx/5xx), usa titulares sintéticos.
 
+    Las descargas se hacen de forma concurrente (asyncio + httpx),
+    pero esta función mantiene una API síncrona.
+
+    La limpieza de los títulos no ocurre aquí: el NLPAgent la hace en
+    lote junto con la vectorización.
+
     Retorna:
       {
         "AAPL": {
             "raw": [{"titulo": "...", "url": "..."}, ...],
-            "clean": ["titulo limpio 1", ...]  # solo si limpiar=True
         },
         ...
       }
     """
-    base_url = "https://es-us.finanzas.yahoo.com/quote/{ticker}/news/"
-    result: Dict[str, Dict[str, List]] = {}
-
-    for t in tickers:
-        url = base_url.format(ticker=t)
-        print(f"Buscando noticias para {t} en {url}")
-
-        articles: List[Dict[str, Optional[str]]] = []
-
-        try:
-            resp = requests.get(url, timeout=10)
-            print(f"  -> status HTTP: {resp.status_code}")
-
-            if resp.status_code == 200:
-                soup = BeautifulSoup(resp.text, "html.parser")
-                links = soup.find_all("a", href=True)
-
-                for a in links:
-                    href = a["href"]
-                    text = a.get_text(strip=True)
-                    if "/news/" in href and text:
-                        full_url = (
-                            href if href.startswith("http") else "https://es-us.finanzas.yahoo.com" + href
-                        )
-                        articles.append({"titulo": text, "url": full_url})
-                        if len(articles) >= max_articles:
-                            break
-
-            if not articles or resp.status_code != 200:
-                print("⚠️ Respuesta no 200 o sin titulares. Se usará fallback.")
-                articles = _fake_news_for_ticker(t, n=max_articles)
-
-        except Exception as e:
-            print(f"⚠️ Error al obtener noticias de {t}: {e}")
-            articles = _fake_news_for_ticker(t, n=max_articles)
-
-        # Limpieza opcional de los títulos
-        if limpiar and limpiar_fn is not None:
-            clean_titles = [limpiar_fn(a["titulo"]) for a in articles]
-        else:
-            clean_titles = None
-
-        result[t] = {"raw": articles, "clean": clean_titles}
+    articles_by_ticker = asyncio.run(_get_news_async(tickers, max_articles))
 
-    return result
+    return {t: {"raw": articles_by_ticker.get(t, [])} for t in tickers}
@@ -4,20 +4,65 @@ Agente analista que usa un LLM (llama3 vía Ollama) para generar el informe fina
 
 from __future__ import annotations
 
-from typing import Dict, Any
+import hashlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any, Iterator, Optional
 
-import pandas as pd
-import ollama
+if TYPE_CHECKING:
+    import pandas as pd
+
+# ollama se importa de forma diferida en _call_llm_stream para no pagar
+# su coste de import en el arranque en frío.
+
+
+_LLM_CACHE_DIR = Path(".cache") / "llm"
+
+# Mensaje de fallback cuando Ollama no responde. Si aparece en la
+# respuesta (al inicio, o en medio si el stream murió tras los primeros
+# trozos), esa respuesta no se cachea para reintentar en la siguiente
+# ejecución.
+_FALLBACK_PREFIX = "No fue posible contactar al modelo LLM"
 
 
 class LLMAnalystAgent:
     """
     Construye un prompt con los datos de mercado, sentimiento y noticias,
     y llama al modelo de lenguaje para generar un informe textual.
+
+    Las respuestas se cachean por hash exacto del prompt (en memoria y
+    en .cache/llm/) para no repagar la generación cuando la misma
+    consulta se re-ejecuta en la sesión de Streamlit.
     """
 
     def __init__(self, model_name: str = "llama3") -> None:
         self.model_name = model_name
+        self._cache: Dict[str, str] = {}
+
+    # ------------------ Caché de prompts ------------------ #
+
+    def _cache_key(self, prompt: str) -> str:
+        # El modelo forma parte de la clave: mismo prompt con otro
+        # modelo debe regenerarse.
+        return hashlib.sha256(f"{self.model_name}\n{prompt}".encode()).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        if key in self._cache:
+            return self._cache[key]
+        try:
+            text = (_LLM_CACHE_DIR / f"{key}.txt").read_text(encoding="utf-8")
+        except OSError:
+            return None
+        self._cache[key] = text
+        return text
+
+    def _cache_set(self, key: str, text: str) -> None:
+        self._cache[key] = text
+        try:
+            _LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            (_LLM_CACHE_DIR / f"{key}.txt").write_text(text, encoding="utf-8")
+        except OSError:
+            # La caché nunca debe romper la generación del informe
+            pass
 
     # ------------------ API pública ------------------ #
 
@@ -29,7 +74,45 @@ class LLMAnalystAgent:
         news: Dict[str, Dict[str, Any]],
     ) -> str:
         prompt = self._build_prompt(user_query, market_summary, sentiments, news)
-        return self._call_llm(prompt)
+
+        key = self._cache_key(prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        answer = self._call_llm(prompt)
+        if answer and _FALLBACK_PREFIX not in answer:
+            self._cache_set(key, answer)
+        return answer
+
+    def build_and_call_stream(
+        self,
+        user_query: str,
+        market_summary: pd.DataFrame,
+        sentiments: Dict[str, Dict[str, Any]],
+        news: Dict[str, Dict[str, Any]],
+    ) -> Iterator[str]:
+        """
+        Variante en streaming: genera el informe trozo a trozo según
+        lo produce el modelo, para pintar la respuesta incrementalmente
+        (p. ej. con st.write_stream en Streamlit).
+        """
+        prompt = self._build_prompt(user_query, market_summary, sentiments, news)
+
+        key = self._cache_key(prompt)
+        cached = self._cache_get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        for chunk in self._call_llm_stream(prompt):
+            parts.append(chunk)
+            yield chunk
+
+        answer = "".join(parts).strip()
+        if answer and _FALLBACK_PREFIX not in answer:
+            self._cache_set(key, answer)
 
     # ------------------ Internas ------------------ #
 
@@ -42,8 +125,20 @@ class LLMAnalystAgent:
     ) -> str:
         """
         Construye un prompt en español para el modelo.
+
+        Se envían solo las columnas relevantes, en CSV y con 2 decimales:
+        menos tokens en el prompt es menos cómputo (y latencia) del LLM
+        con la misma información.
         """
-        summary_text = market_summary.to_string(index=False)
+        summary_cols = [
+            c for c in ("ticker", "precio_inicio", "precio_fin", "variacion_pct")
+            if c in market_summary.columns
+        ]
+        if summary_cols:
+            summary_df = market_summary[summary_cols].round(2)
+        else:
+            summary_df = market_summary
+        summary_text = summary_df.to_csv(index=False).strip()
 
         sentiment_lines = []
         for t, s in sentiments.items():
@@ -57,7 +152,8 @@ class LLMAnalystAgent:
         news_text_blocks = []
         for t, info in news.items():
             titles = [a.get("titulo", "") for a in info.get("raw", []) if a.get("titulo")]
-            joined = " | ".join(titles)
+            # Máximo 3 titulares por ticker, truncados a 120 caracteres
+            joined = " | ".join(titulo[:120] for titulo in titles[:3])
             news_text_blocks.append(f"{t}: {joined}")
         news_text = "\n".join(news_text_blocks)
 
@@ -94,19 +190,31 @@ Escribe el informe en formato de texto, usando subtítulos por ticker.
 
     def _call_llm(self, prompt: str) -> str:
         """
-        Llama al modelo de Ollama y devuelve solo el texto de respuesta.
+        Llama al modelo de Ollama y devuelve el texto completo de respuesta.
+        """
+        return "".join(self._call_llm_stream(prompt)).strip()
+
+    def _call_llm_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Llama al modelo de Ollama con stream=True y va cediendo los
+        trozos de texto según llegan.
         """
         try:
-            response = ollama.chat(
+            import ollama
+
+            stream = ollama.chat(
                 model=self.model_name,
                 messages=[{"role": "user", "content": prompt}],
+                stream=True,
             )
-            content = response.get("message", {}).get("content", "")
-            return content.strip()
+            for chunk in stream:
+                content = chunk.get("message", {}).get("content", "")
+                if content:
+                    yield content
         except Exception as e:
             # Fallback en caso de error con Ollama
-            return (
-                "No fue posible contactar al modelo LLM a través de Ollama.\n"
+            yield (
+                f"{_FALLBACK_PREFIX} a través de Ollama.\n"
                 f"Error: {e}\n\n"
                 "Sin embargo, el sistema sí generó los datos cuantitativos y de sentimiento "
                 "que pueden consultarse en las otras salidas."
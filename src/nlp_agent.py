@@ -4,16 +4,131 @@ Agente de NLP: limpieza de texto y análisis de sentimiento con TF-IDF + Naive B
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import re
+from pathlib import Path
 from typing import Dict, List, Any
 
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
 
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+# nltk, sklearn y joblib se importan de forma diferida dentro de las
+# funciones que los usan, para no pagar su coste en el arranque en frío.
+
+
+# Mapeo de etiquetas compartido entre el agente y el modelo entrenado
+_LABEL_TO_INT = {"negativo": 0, "neutral": 1, "positivo": 2}
+_INT_TO_LABEL = {v: k for k, v in _LABEL_TO_INT.items()}
+
+# Tokenizador ligero para titulares: para textos cortos no hace falta
+# el tokenizador Punkt de NLTK, una regex precompilada basta y es
+# mucho más rápida por llamada.
+_TOKEN_RE = re.compile(r"[a-záéíóúñü0-9]+")
+
+
+@functools.lru_cache(maxsize=1)
+def _load_spanish_stopwords():
+    """
+    Carga las stopwords en español una sola vez por proceso.
+    """
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words("spanish"))
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_text_cached(text: str) -> str:
+    """
+    Versión memoizada de la limpieza de texto. Los titulares se repiten
+    entre reruns (mismos fallbacks), así que la tasa de aciertos es alta.
+    """
+    stopwords_es = _load_spanish_stopwords()
+    tokens = _TOKEN_RE.findall(text.lower())
+    return " ".join(
+        t for t in tokens
+        if len(t) > 2 and t not in stopwords_es
+    )
+
+
+# Corpus manual de entrenamiento (fijo)
+_TEXTOS_ENTRENAMIENTO = [
+    # Positivos
+    "la compañía reporta resultados trimestrales mejor de lo esperado",
+    "analistas revisan al alza sus perspectivas sobre la acción",
+    "aumentan las ventas y el mercado reacciona positivamente",
+    "fuerte demanda en el sector impulsa el precio de la acción",
+    # Negativos
+    "la empresa registra pérdidas mayores de lo previsto",
+    "recorte de guía y preocupaciones sobre la demanda",
+    "caída fuerte de la acción tras resultados decepcionantes",
+    "el regulador investiga a la compañía por posibles irregularidades",
+    # Neutrales
+    "el mercado se mantiene estable sin cambios relevantes",
+    "noticias mixtas en el sector y el precio se mantiene lateral",
+    "la compañía celebra junta de accionistas sin anuncios relevantes",
+    "los analistas esperan pocas sorpresas en el próximo trimestre",
+]
+
+_ETIQUETAS = [
+    "positivo",
+    "positivo",
+    "positivo",
+    "positivo",
+    "negativo",
+    "negativo",
+    "negativo",
+    "negativo",
+    "neutral",
+    "neutral",
+    "neutral",
+    "neutral",
+]
+
+_NLP_CACHE_DIR = Path(".cache") / "nlp"
+
+
+@functools.lru_cache(maxsize=1)
+def _train_sentiment_model():
+    """
+    Entrena el modelo (TF-IDF + Naive Bayes) sobre el corpus manual.
+
+    Como el corpus es fijo, el modelo ajustado se serializa a disco:
+    los arranques siguientes hacen un joblib.load en vez de volver a
+    limpiar y entrenar. El nombre del archivo incluye un hash del
+    corpus y las stopwords, así que cualquier cambio invalida la caché.
+    """
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+
+    corpus_key = hashlib.sha256(
+        "\n".join(
+            _TEXTOS_ENTRENAMIENTO + _ETIQUETAS + sorted(_load_spanish_stopwords())
+        ).encode()
+    ).hexdigest()[:16]
+    model_path = _NLP_CACHE_DIR / f"modelo_{corpus_key}.pkl"
+
+    try:
+        return joblib.load(model_path)
+    except Exception:
+        pass
+
+    vectorizer = TfidfVectorizer()
+    clf = MultinomialNB()
+
+    textos_limpios = [_clean_text_cached(t) for t in _TEXTOS_ENTRENAMIENTO]
+    X = vectorizer.fit_transform(textos_limpios)
+    y = np.array([_LABEL_TO_INT[e] for e in _ETIQUETAS])
+    clf.fit(X, y)
+
+    try:
+        _NLP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # compress=0: carga más rápida a costa de unos KB más en disco
+        joblib.dump((vectorizer, clf), model_path, compress=0)
+    except Exception as e:
+        print(f"⚠️ No se pudo guardar el modelo NLP en disco: {e}")
+
+    return vectorizer, clf
 
 
 class NLPAgent:
@@ -26,15 +141,13 @@ class NLPAgent:
         # Asegurar recursos mínimos de NLTK
         self._ensure_nltk_resources()
 
-        self.spanish_stopwords = set(stopwords.words("spanish"))
+        self.spanish_stopwords = _load_spanish_stopwords()
 
-        # Entrenar modelo Naive Bayes con un corpus pequeño de ejemplo
-        self.vectorizer = TfidfVectorizer()
-        self.clf = MultinomialNB()
-        self.label_to_int = {"negativo": 0, "neutral": 1, "positivo": 2}
-        self.int_to_label = {v: k for k, v in self.label_to_int.items()}
+        self.label_to_int = _LABEL_TO_INT
+        self.int_to_label = _INT_TO_LABEL
 
-        self._train_model()
+        # Modelo Naive Bayes entrenado una sola vez por proceso
+        self.vectorizer, self.clf = _train_sentiment_model()
 
     # ------------------ Utilidades internas ------------------ #
 
@@ -42,19 +155,7 @@ class NLPAgent:
         """
         Intenta descargar los recursos necesarios de NLTK si no están presentes.
         """
-        try:
-            nltk.data.find("tokenizers/punkt")
-        except LookupError:
-            nltk.download("punkt")
-
-        try:
-            nltk.data.find("tokenizers/punkt_tab/spanish")
-        except LookupError:
-            # En algunas versiones nuevas de NLTK se requiere este recurso
-            try:
-                nltk.download("punkt_tab")
-            except Exception:
-                pass
+        import nltk
 
         try:
             nltk.data.find("corpora/stopwords")
@@ -64,57 +165,9 @@ class NLPAgent:
     def _clean_text(self, text: str) -> str:
         """
         Normaliza el texto: minúsculas, eliminación de símbolos y stopwords.
+        Delegado a la versión memoizada a nivel de módulo.
         """
-        text = text.lower()
-        text = re.sub(r"[^a-záéíóúñü0-9\s]", " ", text)
-        tokens = word_tokenize(text, language="spanish")
-        tokens = [
-            t for t in tokens
-            if t not in self.spanish_stopwords and len(t) > 2
-        ]
-        return " ".join(tokens)
-
-    def _train_model(self) -> None:
-        """
-        Entrena el modelo Naive Bayes sobre un pequeño corpus manual.
-        """
-        textos_entrenamiento = [
-            # Positivos
-            "la compañía reporta resultados trimestrales mejor de lo esperado",
-            "analistas revisan al alza sus perspectivas sobre la acción",
-            "aumentan las ventas y el mercado reacciona positivamente",
-            "fuerte demanda en el sector impulsa el precio de la acción",
-            # Negativos
-            "la empresa registra pérdidas mayores de lo previsto",
-            "recorte de guía y preocupaciones sobre la demanda",
-            "caída fuerte de la acción tras resultados decepcionantes",
-            "el regulador investiga a la compañía por posibles irregularidades",
-            # Neutrales
-            "el mercado se mantiene estable sin cambios relevantes",
-            "noticias mixtas en el sector y el precio se mantiene lateral",
-            "la compañía celebra junta de accionistas sin anuncios relevantes",
-            "los analistas esperan pocas sorpresas en el próximo trimestre",
-        ]
-
-        etiquetas = [
-            "positivo",
-            "positivo",
-            "positivo",
-            "positivo",
-            "negativo",
-            "negativo",
-            "negativo",
-            "negativo",
-            "neutral",
-            "neutral",
-            "neutral",
-            "neutral",
-        ]
-
-        textos_limpios = [self._clean_text(t) for t in textos_entrenamiento]
-        X = self.vectorizer.fit_transform(textos_limpios)
-        y = np.array([self.label_to_int[e] for e in etiquetas])
-        self.clf.fit(X, y)
+        return _clean_text_cached(text)
 
     # ------------------ API pública ------------------ #
 
@@ -142,11 +195,27 @@ class NLPAgent:
         """
         result: Dict[str, Dict[str, Any]] = {}
 
-        for ticker, info in news_dict.items():
+        # Recolectar todos los títulos en un solo lote: una única llamada
+        # a transform/predict en lugar de una por ticker.
+        all_titles: List[str] = []
+        offsets = [0]
+
+        for info in news_dict.values():
             raw_articles = info.get("raw", [])
             titles = [a.get("titulo", "") for a in raw_articles if a.get("titulo")]
+            all_titles.extend(self._clean_text(t) for t in titles)
+            offsets.append(len(all_titles))
 
-            if not titles:
+        if all_titles:
+            X = self.vectorizer.transform(all_titles)
+            all_preds = self.clf.predict(X)
+        else:
+            all_preds = np.array([], dtype=int)
+
+        for i, ticker in enumerate(news_dict):
+            y_pred_int = all_preds[offsets[i]:offsets[i + 1]]
+
+            if y_pred_int.size == 0:
                 # Si no hay títulos, devolvemos todo como neutral.
                 result[ticker] = {
                     "sentiments": [],
@@ -157,22 +226,12 @@ class NLPAgent:
                 }
                 continue
 
-            cleaned_titles = [self._clean_text(t) for t in titles]
-            X = self.vectorizer.transform(cleaned_titles)
-            y_pred_int = self.clf.predict(X)
-            y_pred_labels = [self.int_to_label[i] for i in y_pred_int]
+            # Conteos y regla de mayoría directamente sobre el ndarray
+            counts = np.bincount(y_pred_int, minlength=3)
+            num_neg, num_neu, num_pos = int(counts[0]), int(counts[1]), int(counts[2])
+            sentiment_global = self.int_to_label[int(counts.argmax())]
 
-            num_pos = sum(1 for s in y_pred_labels if s == "positivo")
-            num_neg = sum(1 for s in y_pred_labels if s == "negativo")
-            num_neu = sum(1 for s in y_pred_labels if s == "neutral")
-
-            # Regla de mayoría simple
-            counts = {
-                "positivo": num_pos,
-                "negativo": num_neg,
-                "neutral": num_neu,
-            }
-            sentiment_global = max(counts, key=counts.get)
+            y_pred_labels = [self.int_to_label[p] for p in y_pred_int.tolist()]
 
             result[ticker] = {
                 "sentiments": y_pred_labels,
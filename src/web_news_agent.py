@@ -22,11 +22,10 @@ class WebNewsAgent:
         Llama a la función de utilería que intenta hacer scraping a Yahoo Finanzas
         y, en caso de error, usa titulares de ejemplo (fallback).
 
-        No limpia los textos; la limpieza se delega al NLPAgent.
+        No limpia los textos; la limpieza se delega al NLPAgent,
+        que la hace en lote junto con la vectorización.
         """
         return get_news_for_tickers(
             tickers,
             max_articles=self.max_articles,
-            limpiar=False,
-            limpiar_fn=None,
         )